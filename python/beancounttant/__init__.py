@@ -4,7 +4,6 @@
 Contains primary Beancounttant class and its helper classes.
 """
 
-from dataclasses import dataclass
 from datetime import date
 import json
 import os
@@ -12,9 +11,11 @@ from pathlib import Path
 import platform
 import re
 import subprocess
-from typing import List
-from .data import Posting, Transaction
-
+from typing import NamedTuple, Tuple
+from .data import intern_or_none, Posting, Transaction
+from .extraction import AmountExtractor
+from .metrics import DOCUMENTS_PROCESSED, EXTRACT_SECONDS, GENERATE_SECONDS, \
+                     LEDGER_BYTES_WRITTEN, PARSE_FAILURES, WRITE_SECONDS
 
 def open_file_in_default_program(file: Path) -> None:
     """
@@ -49,17 +50,17 @@ class DocumentData:
         self.identifier = id_strs[0]
 
 
-@dataclass
-class PartialDirective:
+class PartialDirective(NamedTuple):
     """
     Holds data that can be used to build a beancount directive.
+    Stored as a tuple with interned strings to keep large configs compact.
     """
     flag: str = ""
     payee: str = ""
     narration: str = ""
-    tags: List[str] = None
+    tags: Tuple[str, ...] = None
     metadata: dict = None
-    postings: List[Posting] = None
+    postings: Tuple[Posting, ...] = None
     hide_payee: bool = False
 
 
@@ -68,17 +69,33 @@ class PartialDirective:
         """
         Constructs a PartialDirective object from data within a dictionary.
         """
-        part_dir = PartialDirective()
-        for attr, value in part_dir.__dict__.items():
+        values = dict()
+        for attr, default in cls._field_defaults.items():
+            value = data.get(attr, default)
             if attr == "postings":
-                posts = data.get("postings", None)
-                if posts:
-                    part_dir.postings = [Posting.from_dict(datum) \
+                value = tuple(Posting.from_dict(datum) \
                      if isinstance(datum, dict) else Posting.from_name(datum) \
-                                         for datum in posts]
-            else:
-                setattr(part_dir, attr, data.get(attr, value))
-        return part_dir
+                              for datum in value) if value else None
+            elif isinstance(value, list):
+                value = tuple(intern_or_none(item) \
+                              if isinstance(item, str) else item \
+                              for item in value)
+            elif isinstance(value, str):
+                value = intern_or_none(value)
+            values[attr] = value
+        return cls(**values)
+
+
+
+def load_group_directives(groups: dict) -> dict:
+    """
+    Builds PartialDirective objects from the groups section of a config.
+    """
+    directives = dict()
+    for group_name, group_data in groups.items():
+        directives[group_name] = {name: PartialDirective.from_dict(values)
+                                  for name, values in group_data.items()}
+    return directives
 
 
 
@@ -91,12 +108,14 @@ class Beancounttant:
                  default_transaction_flag: str,
                  patterns: dict,
                  settings: dict,
-                 group_directives: dict) -> None:
+                 group_directives: dict,
+                 amount_extractor: AmountExtractor = None) -> None:
         self.__default_beancount_file = default_beancount_file
         self.__default_transaction_flag = default_transaction_flag
         self.__patterns = patterns
         self.__settings = settings
         self.__group_directives = group_directives
+        self.__amount_extractor = amount_extractor
 
 
     def find_beancount_file(self, _: DocumentData) -> Path:
@@ -126,7 +145,7 @@ class Beancounttant:
                         if group_attr:
                             if isinstance(group_attr, dict):
                                 data_dict.update(group_attr)
-                            elif isinstance(group_attr, list):
+                            elif isinstance(group_attr, (list, tuple)):
                                 data.extend(group_attr)
                             else:
                                 data.append(group_attr)
@@ -143,33 +162,64 @@ class Beancounttant:
         """
         Generates a beancount transaction from a document.
         """
-        flag = self.find_directive_data("flag", data)
-        narration = self.find_directive_data("narration", data)
-        hide_payee_data = self.find_directive_data("hide_payee", data)
-        hide_payee = hide_payee_data[0] if hide_payee_data else False
-
-        return Transaction(
-            date=data.date,
-            flag=flag[0] if flag else self.__default_transaction_flag,
-            payee=None if hide_payee else data.identifier,
-            narration=narration[0] if narration else None,
-            tags=self.find_directive_data("tags", data),
-            links=self.find_directive_data("links", data),
-            meta=self.find_directive_data("metadata", data),
-            postings=self.find_directive_data("postings", data)
-        )
+        with GENERATE_SECONDS.time():
+            flag = self.find_directive_data("flag", data)
+            narration = self.find_directive_data("narration", data)
+            hide_payee_data = self.find_directive_data("hide_payee", data)
+            hide_payee = hide_payee_data[0] if hide_payee_data else False
+
+            return Transaction(
+                date=data.date,
+                flag=flag[0] if flag else self.__default_transaction_flag,
+                payee=None if hide_payee else data.identifier,
+                narration=narration[0] if narration else None,
+                tags=self.find_directive_data("tags", data),
+                links=self.find_directive_data("links", data),
+                meta=self.find_directive_data("metadata", data),
+                postings=self.find_directive_data("postings", data)
+            )
+
+    def fill_amounts(self,
+                     transaction: Transaction,
+                     document: Path) -> Transaction:
+        """
+        Fills posting amounts from the document's sidecar statement file.
+        Transactions are returned unchanged if extraction isn't configured.
+        """
+        if not self.__amount_extractor:
+            return transaction
+        with EXTRACT_SECONDS.time():
+            return self.__amount_extractor.fill_amounts(transaction, document)
+
+    @staticmethod
+    def write_transaction(transaction: Transaction,
+                          beancount_file: Path) -> None:
+        """
+        Appends a transaction to a beancount file.
+        """
+        transaction_str = str(transaction)
+        with WRITE_SECONDS.time(), \
+                beancount_file.open("a") as beancount_file_ptr:
+            beancount_file_ptr.write(transaction_str)
+        LEDGER_BYTES_WRITTEN.inc(len(transaction_str.encode()))
+        DOCUMENTS_PROCESSED.inc()
 
     def parse_document_filename(self, name: str) -> DocumentData:
         """
         Parses a document's filename for beancount data.
         """
-        groups = {group: re.findall(pattern, name)
-                  for (group, pattern) in self.__patterns.items()}
-        all_matches = [match for group in groups.values() for match in group]
-        if not groups or not all_matches:
-            parse_error_format = "Unable to parse document filename '{}'!"
-            raise ValueError(parse_error_format.format(name))
-        return DocumentData(groups)
+        try:
+            groups = {group: re.findall(pattern, name)
+                      for (group, pattern) in self.__patterns.items()}
+            all_matches = [match for group in groups.values()
+                           for match in group]
+            if not groups or not all_matches:
+                parse_error_format = "Unable to parse document filename '{}'!"
+                raise ValueError(parse_error_format.format(name))
+            return DocumentData(groups)
+        except ValueError:
+            PARSE_FAILURES.inc()
+            raise
 
 
     def get_setting(self, setting_name: str) -> bool:
@@ -187,12 +237,12 @@ class Beancounttant:
         with file.open("r") as file_obj:
             config_data = json.load(file_obj)
 
-        directives = dict()
-        for group_name, group_data in config_data["groups"].items():
-            directives[group_name] = {name: PartialDirective.from_dict(values)
-                                      for name, values in group_data.items()}
+        directives = load_group_directives(config_data["groups"])
+        extraction_data = config_data.get("extraction", None)
         return Beancounttant(config_data["default_beancount_file"],
                              config_data["default_transaction_flag"],
                              config_data["patterns"],
                              config_data["settings"],
-                             directives)
+                             directives,
+                             AmountExtractor.from_dict(extraction_data) \
+                                 if extraction_data else None)
@@ -4,13 +4,23 @@
 Contains enhanced versions of Beancount classes for Beancounttant.
 """
 
-from typing import Iterable
+from functools import lru_cache
+import sys
+from typing import Iterable, Optional
 from beancount.core.amount import Amount
 import beancount.core.data as beandata
 from beancount.core.number import Decimal
 from beancount.core.position import CostSpec
 
 
+def intern_or_none(string: Optional[str]) -> Optional[str]:
+    """
+    Interns a string so that repeated configuration values share storage.
+    None is passed through unchanged.
+    """
+    return None if string is None else sys.intern(string)
+
+
 def str_or_empty(string: str) -> str:
     """
     Ensures None or '' strings are output as an empty string.
@@ -67,6 +77,15 @@ def cost_to_str(cost: CostSpec) -> str:
     return cost_fmt.format(' '.join(cost_strs))
 
 
+@lru_cache(maxsize=None)
+def shared_amount(number: str, currency: str) -> Amount:
+    """
+    Returns a shared, immutable Amount for the given number and currency.
+    Configured postings reuse these instead of allocating identical Amounts.
+    """
+    return Amount(Decimal(number), intern_or_none(currency))
+
+
 class Posting(beandata.Posting):
     """
     Extends beancount's Posting class to provide easier init & printing.
@@ -91,14 +110,14 @@ class Posting(beandata.Posting):
             else CostSpec(
                 None if costs[0] is None else Decimal(costs[0]),
                 None if costs[1] is None else Decimal(costs[1]),
-                data.get("cost_currency", "USD"),
+                intern_or_none(data.get("cost_currency", "USD")),
                 date=None,
                 label=None,
                 merge=None)
         post_meta = dict(hide_amt=True) if data.get("hide_amt", None) else None
-        return Posting(data["account"],
-                       Amount(Decimal(data.get("amount", "0.00")),
-                              data.get("currency", "USD")),
+        return Posting(sys.intern(data["account"]),
+                       shared_amount(data.get("amount", "0.00"),
+                                     data.get("currency", "USD")),
                        cost=cost_data,
                        price=None,
                        flag=None,
@@ -109,8 +128,8 @@ class Posting(beandata.Posting):
         """
         Constructs a default Beancount posting from an account name.
         """
-        return Posting(account,
-                       Amount(Decimal("0.00"), "USD"),
+        return Posting(sys.intern(account),
+                       shared_amount("0.00", "USD"),
                        cost=None,
                        price=None,
                        flag=None,
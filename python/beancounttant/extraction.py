@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+
+"""
+Contains helpers which extract posting amounts from sidecar statement files.
+"""
+
+import csv
+import logging
+import mmap
+from pathlib import Path
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Pattern, Union
+from beancount.core.amount import Amount
+from beancount.core.number import Decimal
+from .data import intern_or_none, Transaction
+
+MMAP_THRESHOLD = 1024 * 1024
+CURRENCY_PREFIX = re.compile(r"^(?:[A-Z]{3}(?![A-Z])|[$€£¥₹₩₽₪¢])\s*")
+CURRENCY_SUFFIX = re.compile(r"\s*(?:(?<![A-Z])[A-Z]{3}|[$€£¥₹₩₽₪¢])$")
+AGGREGATES = ("sum", "first", "last")
+
+
+def _strip_currency(text: str) -> str:
+    """
+    Removes a leading or trailing currency symbol or ISO currency code.
+    """
+    return CURRENCY_SUFFIX.sub("", CURRENCY_PREFIX.sub("", text))
+
+
+def parse_amount(text: str,
+                 decimal_separator: str = ".",
+                 thousands_separator: str = ",") -> Decimal:
+    """
+    Parses an amount from statement text using the given separators.
+    Currency symbols and codes are ignored, and amounts in parentheses or
+    with a single leading or trailing sign are supported. Text which isn't a
+    well-formed number, such as '12.50 CR', raises a ValueError rather than
+    being guessed at.
+    """
+    error = ValueError(f"Unable to parse amount '{text}'!")
+    number = text.strip()
+    negative = False
+    signs = 0
+    if number.startswith("(") and number.endswith(")"):
+        negative = True
+        signs = 1
+        number = number[1:-1].strip()
+
+    while True:
+        stripped = _strip_currency(number)
+        if stripped[:1] in ("-", "+"):
+            negative ^= stripped[0] == "-"
+            stripped = stripped[1:].strip()
+            signs += 1
+        elif stripped[-1:] in ("-", "+"):
+            negative ^= stripped[-1] == "-"
+            stripped = stripped[:-1].strip()
+            signs += 1
+        if stripped == number:
+            break
+        number = stripped
+    if signs > 1:
+        raise error
+
+    decimal = re.escape(decimal_separator)
+    thousands = re.escape(thousands_separator)
+    fraction = f"(?:{decimal}\\d+)?"
+    pattern = f"(?:\\d+{fraction}|{decimal}\\d+"
+    if thousands_separator:
+        pattern += f"|\\d{{1,3}}(?:{thousands}\\d{{3}})+{fraction}"
+    if not re.fullmatch(pattern + ")", number):
+        raise error
+
+    if thousands_separator:
+        number = number.replace(thousands_separator, "")
+    amount = Decimal(number.replace(decimal_separator, "."))
+    return -amount if negative else amount
+
+
+def iter_lines(file: Path,
+               encoding: str = "utf-8-sig",
+               mmap_threshold: int = MMAP_THRESHOLD) -> Iterator[str]:
+    """
+    Yields the lines of a file one at a time without reading it fully.
+    Files of at least mmap_threshold bytes are read through a memory map.
+    """
+    with file.open("rb") as file_obj:
+        size = file.stat().st_size
+        if size and size >= mmap_threshold:
+            with mmap.mmap(file_obj.fileno(), 0,
+                           access=mmap.ACCESS_READ) as mapped:
+                for line in iter(mapped.readline, b""):
+                    yield line.decode(encoding)
+        else:
+            for line in file_obj:
+                yield line.decode(encoding)
+
+
+class AmountRule(NamedTuple):
+    """
+    Describes how to extract the amount of a posting from a sidecar file.
+    Column rules read a column of CSV sidecars, optionally through a regex.
+    Rules without a column search every line of any sidecar with a regex.
+    """
+    account: str
+    column: Union[str, int, None] = None
+    regex: Optional[Pattern] = None
+    match_column: Union[str, int, None] = None
+    match: Optional[Pattern] = None
+    aggregate: str = "sum"
+    negate: bool = False
+    currency: Optional[str] = None
+
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AmountRule":
+        """
+        Constructs an AmountRule object from data within a dictionary.
+        """
+        aggregate = data.get("aggregate", "sum")
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown amount aggregate '{aggregate}'!")
+        if data.get("column", None) is None and not data.get("regex", None):
+            raise ValueError("Amount rules require a column or a regex!")
+        regex = data.get("regex", None)
+        match = data.get("match", None)
+        return AmountRule(intern_or_none(data["account"]),
+                          column=data.get("column", None),
+                          regex=re.compile(regex) if regex else None,
+                          match_column=data.get("match_column", None),
+                          match=re.compile(match) if match else None,
+                          aggregate=aggregate,
+                          negate=data.get("negate", False),
+                          currency=intern_or_none(data.get("currency", None)))
+
+
+    def search(self,
+               text: str,
+               decimal_separator: str = ".",
+               thousands_separator: str = ",") -> Optional[Decimal]:
+        """
+        Returns the amount found in text, or None if the rule doesn't match.
+        """
+        if self.regex is None:
+            return parse_amount(text, decimal_separator, thousands_separator) \
+                if text.strip() else None
+        found = self.regex.search(text)
+        if not found:
+            return None
+        group = "amount" if "amount" in self.regex.groupindex else \
+            (1 if self.regex.groups else 0)
+        return parse_amount(found.group(group),
+                            decimal_separator,
+                            thousands_separator)
+
+
+class _Accumulator:
+    """
+    Aggregates the amounts found by a single rule.
+    """
+    def __init__(self, rule: AmountRule) -> None:
+        self.rule = rule
+        self.amount = None
+        self.skipped = 0
+
+
+    def add(self, amount: Optional[Decimal]) -> None:
+        """
+        Combines an amount found by the rule with those found previously.
+        """
+        if amount is None:
+            return
+        if self.amount is None or self.rule.aggregate == "last":
+            self.amount = amount
+        elif self.rule.aggregate == "sum":
+            self.amount += amount
+
+
+class AmountExtractor:
+    """
+    Fills posting amounts from sidecar CSV or text files next to documents.
+    """
+    def __init__(self,
+                 rules: List[AmountRule],
+                 sidecar_suffixes: List[str] = (".csv", ".txt"),
+                 encoding: str = "utf-8-sig",
+                 has_header: bool = True,
+                 mmap_threshold: int = MMAP_THRESHOLD,
+                 decimal_separator: str = ".",
+                 thousands_separator: str = ",",
+                 delimiter: str = ",") -> None:
+        if len(decimal_separator) != 1:
+            raise ValueError("Decimal separator must be a single character!")
+        if len(thousands_separator) > 1 \
+                or thousands_separator == decimal_separator:
+            raise ValueError("Thousands separator must be a single character "
+                             "which differs from the decimal separator!")
+        if any(rule.column is not None for rule in rules) and \
+                ".csv" not in [suffix.lower() for suffix in sidecar_suffixes]:
+            raise ValueError("Column amount rules require a .csv sidecar "
+                             "suffix!")
+        self.rules = rules
+        self.sidecar_suffixes = sidecar_suffixes
+        self.encoding = encoding
+        self.has_header = has_header
+        self.mmap_threshold = mmap_threshold
+        self.decimal_separator = decimal_separator
+        self.thousands_separator = thousands_separator
+        self.delimiter = delimiter
+
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AmountExtractor":
+        """
+        Constructs an AmountExtractor object from data within a dictionary.
+        """
+        return AmountExtractor(
+            [AmountRule.from_dict(rule) for rule in data.get("rules", [])],
+            sidecar_suffixes=data.get("sidecar_suffixes", (".csv", ".txt")),
+            encoding=data.get("encoding", "utf-8-sig"),
+            has_header=data.get("has_header", True),
+            mmap_threshold=data.get("mmap_threshold", MMAP_THRESHOLD),
+            decimal_separator=data.get("decimal_separator", "."),
+            thousands_separator=data.get("thousands_separator", ","),
+            delimiter=data.get("delimiter", ","))
+
+
+    def find_sidecar(self, document: Path) -> Optional[Path]:
+        """
+        Returns the first sidecar file which exists next to a document.
+        """
+        for suffix in self.sidecar_suffixes:
+            sidecar = document.with_suffix(suffix)
+            if sidecar != document and sidecar.is_file():
+                return sidecar
+        return None
+
+
+    def extract(self, sidecar: Path) -> Dict[str, Amount]:
+        """
+        Returns the amounts found in a sidecar file, keyed by account.
+        Amounts have no currency unless their rule defines one. Values which
+        can't be parsed are skipped, as are rules whose columns are missing.
+        """
+        logger = logging.getLogger()
+        line_accumulators = [_Accumulator(rule) for rule in self.rules
+                             if rule.column is None]
+        lines = self.__scan_lines(
+            iter_lines(sidecar, self.encoding, self.mmap_threshold),
+            line_accumulators)
+        column_accumulators = []
+        if sidecar.suffix.lower() == ".csv":
+            column_accumulators = [_Accumulator(rule) for rule in self.rules
+                                   if rule.column is not None]
+            self.__scan_csv(lines, column_accumulators, sidecar)
+        for _ in lines:
+            pass
+
+        amounts = dict()
+        for accumulator in line_accumulators + column_accumulators:
+            rule = accumulator.rule
+            if accumulator.skipped:
+                logger.warning("Skipped %d unparseable amounts for '%s' in "
+                               "sidecar '%s'.", accumulator.skipped,
+                               rule.account, sidecar.name)
+            if accumulator.amount is not None:
+                number = -accumulator.amount if rule.negate \
+                    else accumulator.amount
+                amounts[rule.account] = Amount(number, rule.currency)
+        return amounts
+
+
+    def fill_amounts(self,
+                     transaction: Transaction,
+                     document: Path) -> Transaction:
+        """
+        Returns a transaction with posting amounts filled from the sidecar file
+        of a document. Transactions are returned unchanged if there is no
+        sidecar or it can't be read, keeping their configured amounts.
+        """
+        sidecar = self.find_sidecar(document)
+        if not sidecar or not transaction.postings:
+            return transaction
+
+        try:
+            amounts = self.extract(sidecar)
+        except (OSError, ValueError, csv.Error) as error:
+            logger = logging.getLogger()
+            logger.warning("Unable to extract amounts from sidecar '%s': %s",
+                           sidecar.name, error)
+            return transaction
+
+        postings = []
+        for posting in transaction.postings:
+            amount = amounts.get(posting.account, None)
+            if amount is not None:
+                currency = amount.currency or (posting.units.currency
+                                               if posting.units else "USD")
+                posting = posting._replace(units=Amount(amount.number,
+                                                        currency),
+                                           meta=None)
+            postings.append(posting)
+        return transaction._replace(postings=postings)
+
+
+    def __search(self, accumulator: _Accumulator, text: str) -> None:
+        try:
+            accumulator.add(accumulator.rule.search(text,
+                                                    self.decimal_separator,
+                                                    self.thousands_separator))
+        except ValueError:
+            accumulator.skipped += 1
+
+
+    def __scan_lines(self,
+                     lines: Iterator[str],
+                     accumulators: List[_Accumulator]) -> Iterator[str]:
+        # Searches each raw line before passing it on, so that line rules
+        # also apply to CSV sidecars while they are parsed in the same pass.
+        for line in lines:
+            for accumulator in accumulators:
+                match = accumulator.rule.match
+                if match is None or match.search(line):
+                    self.__search(accumulator, line)
+            yield line
+
+
+    def __scan_csv(self,
+                   lines: Iterator[str],
+                   accumulators: List[_Accumulator],
+                   sidecar: Path) -> None:
+        logger = logging.getLogger()
+        reader = csv.reader(lines, delimiter=self.delimiter)
+        header = next(reader, []) if self.has_header else []
+        columns = {name.strip(): index for index, name in enumerate(header)}
+
+        lookups = []
+        for accumulator in accumulators:
+            rule = accumulator.rule
+            indices = []
+            for column in (rule.column, rule.match_column):
+                if isinstance(column, str) and column not in columns:
+                    logger.warning("Unable to find column '%s' in sidecar "
+                                   "'%s'.", column, sidecar.name)
+                    break
+                indices.append(columns.get(column, column))
+            else:
+                lookups.append((accumulator, *indices))
+
+        for row in reader:
+            for accumulator, value_index, match_index in lookups:
+                rule = accumulator.rule
+                if value_index >= len(row):
+                    continue
+                if rule.match is not None:
+                    match_text = row[match_index] \
+                        if match_index is not None and match_index < len(row) \
+                        else self.delimiter.join(row)
+                    if not rule.match.search(match_text):
+                        continue
+                self.__search(accumulator, row[value_index])
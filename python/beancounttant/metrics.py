@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+
+"""
+Contains operational metrics for Beancounttant and their Prometheus export.
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LOCK_TIMEOUT = 10.0
+LOCK_POLL_SECONDS = 0.01
+METRICS_FILE_VARIABLE = "BEANCOUNTTANT_METRICS_FILE"
+
+
+def format_value(value: float) -> str:
+    """
+    Formats a metric value as a Prometheus sample value.
+    """
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def read_textfile(file: Path) -> Dict[str, float]:
+    """
+    Returns the sample values in a Prometheus text format file, keyed by
+    sample name and labels. A missing file has no samples.
+    """
+    samples = dict()
+    try:
+        with file.open("r") as file_obj:
+            for line in file_obj:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                key, _, value = line.rpartition(" ")
+                try:
+                    samples[key] = int(value)
+                except ValueError:
+                    samples[key] = float(value)
+    except FileNotFoundError:
+        pass
+    return samples
+
+
+@contextmanager
+def textfile_lock(file: Path,
+                  timeout: float = LOCK_TIMEOUT) -> Iterator[None]:
+    """
+    Holds a lock file next to a textfile so that only one process at a time
+    updates it. Locks older than the timeout are assumed to have been left
+    behind by a process which died, and are broken.
+    """
+    lock_file = file.with_name(f"{file.name}.lock")
+    while True:
+        try:
+            os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_file.stat().st_mtime > timeout:
+                    lock_file.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(LOCK_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        try:
+            lock_file.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class Metric(ABC):
+    """
+    Base class for metrics that can be exported in Prometheus text format.
+    """
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """
+        Returns (name, labels, value) samples for this metric.
+        """
+
+
+    def is_cumulative(self, _: str) -> bool:
+        """
+        Returns whether a sample only accumulates, so that the values of
+        separate processes can be added together.
+        """
+        return False
+
+
+    def expose(self,
+               samples: Optional[List[Tuple[str, str, float]]] = None) -> str:
+        """
+        Returns this metric, or the given samples of it, in Prometheus text
+        format.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}",
+                 f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(f"{name}{labels} {format_value(value)}"
+                     for name, labels, value in
+                     (self.samples() if samples is None else samples))
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    """
+    A value which only ever increases.
+    """
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self.value = 0
+
+
+    def inc(self, amount: float = 1) -> None:
+        """
+        Increases the counter by the given amount.
+        """
+        if amount < 0:
+            raise ValueError("Counters can only be increased!")
+        with self._lock:
+            self.value += amount
+
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, "", self.value)]
+
+
+    def is_cumulative(self, _: str) -> bool:
+        return True
+
+
+class Gauge(Metric):
+    """
+    A value which can be set, increased or decreased.
+    """
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self.value = 0
+
+
+    def set(self, value: float) -> None:
+        """
+        Sets the gauge to the given value.
+        """
+        self.value = value
+
+
+    def inc(self, amount: float = 1) -> None:
+        """
+        Increases the gauge by the given amount.
+        """
+        with self._lock:
+            self.value += amount
+
+
+    def dec(self, amount: float = 1) -> None:
+        """
+        Decreases the gauge by the given amount.
+        """
+        with self._lock:
+            self.value -= amount
+
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, "", self.value)]
+
+
+class Summary(Metric):
+    """
+    Tracks the count and sum of observations, along with quantiles computed
+    over a window of the most recent observations.
+    """
+    metric_type = "summary"
+    quantiles = (0.5, 0.9, 0.99)
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 window: int = 1024) -> None:
+        super().__init__(name, documentation)
+        self.count = 0
+        self.total = 0.0
+        self.__window = deque(maxlen=window)
+
+
+    def observe(self, value: float) -> None:
+        """
+        Records a single observation.
+        """
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.__window.append(value)
+
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """
+        Observes the number of seconds spent within the context.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+    def quantile(self, quantile: float) -> float:
+        """
+        Returns a quantile of the observation window, or NaN if it is empty.
+        """
+        with self._lock:
+            window = sorted(self.__window)
+        if not window:
+            return math.nan
+        index = min(len(window) - 1, int(quantile * len(window)))
+        return window[index]
+
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        samples = [(self.name, f'{{quantile="{quantile}"}}',
+                    self.quantile(quantile)) for quantile in self.quantiles]
+        samples.append((f"{self.name}_sum", "", self.total))
+        samples.append((f"{self.name}_count", "", self.count))
+        return samples
+
+
+    def is_cumulative(self, sample_name: str) -> bool:
+        return sample_name != self.name
+
+
+class MetricsRegistry:
+    """
+    Holds a set of named metrics and exports them together.
+    """
+    def __init__(self) -> None:
+        self.__metrics: Dict[str, Metric] = dict()
+        self.__lock = threading.Lock()
+        self.__write_lock = threading.Lock()
+        self.__written: Dict[Path, Dict[str, float]] = dict()
+
+
+    def __register(self, metric_class: type, name: str, *args) -> Metric:
+        with self.__lock:
+            metric = self.__metrics.get(name, None)
+            if metric is None:
+                metric = metric_class(name, *args)
+                self.__metrics[name] = metric
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric '{name}' is already registered!")
+            return metric
+
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        """
+        Returns the counter with the given name, creating it if necessary.
+        """
+        return self.__register(Counter, name, documentation)
+
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        """
+        Returns the gauge with the given name, creating it if necessary.
+        """
+        return self.__register(Gauge, name, documentation)
+
+
+    def summary(self, name: str, documentation: str) -> Summary:
+        """
+        Returns the summary with the given name, creating it if necessary.
+        """
+        return self.__register(Summary, name, documentation)
+
+
+    def expose(self) -> str:
+        """
+        Returns all metrics in Prometheus text format.
+        """
+        with self.__lock:
+            metrics = list(self.__metrics.values())
+        return "".join(metric.expose() for metric in metrics)
+
+
+    def write_textfile(self, file: Path, merge: bool = False) -> None:
+        """
+        Atomically writes all metrics to a textfile collector file.
+        When merging, counters and summary sums and counts already in the file
+        are kept and increased by what this process has added since it last
+        wrote the file, so short-lived processes can share one file. Gauges
+        and quantiles always hold the values of the latest process.
+        """
+        with self.__write_lock:
+            if not merge:
+                self.__replace_textfile(file, self.expose())
+                return
+
+            with textfile_lock(file):
+                existing = read_textfile(file)
+                written = self.__written.setdefault(file.resolve(), dict())
+                with self.__lock:
+                    metrics = list(self.__metrics.values())
+
+                text = []
+                for metric in metrics:
+                    samples = []
+                    for name, labels, value in metric.samples():
+                        if metric.is_cumulative(name):
+                            key = name + labels
+                            current = value
+                            value = existing.get(key, 0) + current \
+                                - written.get(key, 0)
+                            written[key] = current
+                        samples.append((name, labels, value))
+                    text.append(metric.expose(samples))
+                self.__replace_textfile(file, "".join(text))
+
+
+    @staticmethod
+    def __replace_textfile(file: Path, text: str) -> None:
+        temp_file = file.with_name(f"{file.name}.{os.getpid()}.tmp")
+        with temp_file.open("w") as file_obj:
+            file_obj.write(text)
+        os.replace(temp_file, file)
+
+
+    def serve(self,
+              port: int,
+              host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serves all metrics over HTTP from a background thread.
+        Call shutdown() on the returned server to stop serving.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            """
+            Responds to every GET request with the current metrics.
+            """
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                body = registry.expose().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+REGISTRY = MetricsRegistry()
+
+DOCUMENTS_PROCESSED = REGISTRY.counter(
+    "beancounttant_documents_processed_total",
+    "Documents for which a transaction was written.")
+PARSE_FAILURES = REGISTRY.counter(
+    "beancounttant_parse_failures_total",
+    "Document filenames which could not be parsed.")
+GENERATE_SECONDS = REGISTRY.summary(
+    "beancounttant_generate_seconds",
+    "Time taken to generate a transaction.")
+EXTRACT_SECONDS = REGISTRY.summary(
+    "beancounttant_extract_seconds",
+    "Time taken to fill posting amounts from a sidecar file.")
+WRITE_SECONDS = REGISTRY.summary(
+    "beancounttant_write_seconds",
+    "Time taken to write a transaction to a beancount file.")
+LEDGER_BYTES_WRITTEN = REGISTRY.counter(
+    "beancounttant_ledger_bytes_written_total",
+    "Bytes written to beancount files.")
+QUEUE_DEPTH = REGISTRY.gauge(
+    "beancounttant_queue_depth",
+    "Documents waiting to be processed.")
+CONFIG_CACHE_HITS = REGISTRY.counter(
+    "beancounttant_config_cache_hits_total",
+    "Configuration lookups served from the registry cache.")
+CONFIG_CACHE_MISSES = REGISTRY.counter(
+    "beancounttant_config_cache_misses_total",
+    "Configuration lookups which required loading the config.")
+CONFIG_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "beancounttant_config_cache_hit_ratio",
+    "Fraction of configuration lookups served from the registry cache.")
+
+
+def update_config_cache_hit_ratio() -> None:
+    """
+    Recalculates the config cache hit ratio from the hit and miss counters.
+    """
+    lookups = CONFIG_CACHE_HITS.value + CONFIG_CACHE_MISSES.value
+    CONFIG_CACHE_HIT_RATIO.set(CONFIG_CACHE_HITS.value / lookups
+                               if lookups else 0.0)
+
+
+def export_textfile(file: Optional[Path] = None) -> None:
+    """
+    Merges metrics into a textfile collector file, which defaults to the
+    file named by the BEANCOUNTTANT_METRICS_FILE environment variable.
+    Nothing is written if no file is given or named.
+    """
+    if file is None and os.environ.get(METRICS_FILE_VARIABLE, None):
+        file = Path(os.environ[METRICS_FILE_VARIABLE])
+    if file:
+        REGISTRY.write_textfile(file, merge=True)
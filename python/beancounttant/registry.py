@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+"""
+Contains a registry that shares loaded Beancounttant configurations.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from . import Beancounttant
+from .metrics import CONFIG_CACHE_HITS, CONFIG_CACHE_MISSES, \
+                     update_config_cache_hit_ratio
+
+
+@dataclass
+class ConfigStats:
+    """
+    Holds usage statistics for a single configuration file.
+    """
+    hits: int = 0
+    misses: int = 0
+    reloads: int = 0
+    evictions: int = 0
+    load_count: int = 0
+    total_load_seconds: float = 0.0
+    last_load_seconds: float = 0.0
+
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Returns the fraction of lookups served without loading the config.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+    @property
+    def mean_load_seconds(self) -> float:
+        """
+        Returns the average time taken to load the config.
+        """
+        return self.total_load_seconds / self.load_count \
+            if self.load_count else 0.0
+
+
+@dataclass
+class _RegistryEntry:
+    """
+    Holds a loaded configuration and the file state it was loaded from.
+    """
+    beancounttant: Beancounttant
+    signature: Tuple[int, int]
+    size: int
+
+
+def file_signature(file: Path) -> Tuple[int, int]:
+    """
+    Returns a signature that changes whenever the given file is modified.
+    """
+    stat = file.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def current_signature(file: Path) -> Optional[Tuple[int, int]]:
+    """
+    Returns the signature of a file, or None if it can't be read.
+    """
+    try:
+        return file_signature(file)
+    except OSError:
+        return None
+
+
+class BeancounttantRegistry:
+    """
+    Lazily loads Beancounttant configurations by path, keeping the most
+    recently used ones in memory and reloading any that change on disk.
+
+    The size of an entry is the size of its configuration file in bytes.
+    """
+    def __init__(self,
+                 max_count: Optional[int] = None,
+                 max_size: Optional[int] = None,
+                 loader: Callable[[Path], Beancounttant] = \
+                     Beancounttant.load_config) -> None:
+        if max_count is not None and max_count < 1:
+            raise ValueError("Registry max_count must be at least 1!")
+        if max_size is not None and max_size < 1:
+            raise ValueError("Registry max_size must be at least 1!")
+        self.__max_count = max_count
+        self.__max_size = max_size
+        self.__loader = loader
+        self.__entries: "OrderedDict[Path, _RegistryEntry]" = OrderedDict()
+        self.__stats: Dict[Path, ConfigStats] = dict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+        self.__loading_locks: Dict[Path, threading.Lock] = dict()
+
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+    def __contains__(self, config_file: Path) -> bool:
+        return Path(config_file).resolve() in self.__entries
+
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the combined size of all loaded configurations.
+        """
+        return self.__size
+
+
+    def get(self, config_file: Path) -> Beancounttant:
+        """
+        Returns the Beancounttant for a config file, loading it if necessary.
+        Loads happen outside the registry lock, so a slow load only blocks
+        other lookups of the same config file.
+        """
+        key = Path(config_file).resolve()
+        with self.__lock:
+            stats = self.__stats.setdefault(key, ConfigStats())
+            cached = self.__lookup(key, stats)
+            if cached:
+                return cached
+            key_lock = self.__loading_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have loaded the config while we waited.
+            with self.__lock:
+                cached = self.__lookup(key, stats)
+                if cached:
+                    return cached
+
+            try:
+                signature = file_signature(key)
+                start = time.perf_counter()
+                beancounttant = self.__loader(key)
+                elapsed = time.perf_counter() - start
+
+                with self.__lock:
+                    stats.misses += 1
+                    CONFIG_CACHE_MISSES.inc()
+                    update_config_cache_hit_ratio()
+                    stats.load_count += 1
+                    stats.total_load_seconds += elapsed
+                    stats.last_load_seconds = elapsed
+                    if key in self.__entries:
+                        stats.reloads += 1
+                        self.__remove(key, drop_lock=False)
+
+                    # Configs changed during loading are returned uncached.
+                    if current_signature(key) == signature:
+                        self.__entries[key] = _RegistryEntry(beancounttant,
+                                                             signature,
+                                                             signature[1])
+                        self.__size += signature[1]
+                        self.__evict(keep=key)
+                return beancounttant
+            finally:
+                with self.__lock:
+                    if key not in self.__entries:
+                        self.__loading_locks.pop(key, None)
+
+
+    def invalidate(self, config_file: Path) -> None:
+        """
+        Removes a config file from the registry if it is loaded.
+        """
+        with self.__lock:
+            self.__remove(Path(config_file).resolve())
+
+
+    def clear(self) -> None:
+        """
+        Removes all loaded configurations from the registry.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__loading_locks.clear()
+            self.__size = 0
+
+
+    def stats(self) -> Dict[Path, ConfigStats]:
+        """
+        Returns a copy of the usage statistics for each config file.
+        """
+        with self.__lock:
+            return {key: ConfigStats(**vars(stats))
+                    for key, stats in self.__stats.items()}
+
+
+    def __lookup(self,
+                 key: Path,
+                 stats: ConfigStats) -> Optional[Beancounttant]:
+        entry = self.__entries.get(key, None)
+        if not entry:
+            return None
+        signature = current_signature(key)
+        if signature is None:
+            self.__remove(key)
+            return None
+        if entry.signature == signature:
+            stats.hits += 1
+            CONFIG_CACHE_HITS.inc()
+            update_config_cache_hit_ratio()
+            self.__entries.move_to_end(key)
+            return entry.beancounttant
+        return None
+
+
+    def __remove(self, key: Path, drop_lock: bool = True) -> None:
+        entry = self.__entries.pop(key, None)
+        if entry:
+            self.__size -= entry.size
+        if drop_lock:
+            self.__loading_locks.pop(key, None)
+
+
+    def __over_limit(self) -> bool:
+        return (self.__max_count is not None
+                and len(self.__entries) > self.__max_count) \
+            or (self.__max_size is not None and self.__size > self.__max_size)
+
+
+    def __evict(self, keep: Path) -> None:
+        # The newest entry is kept even when it alone exceeds max_size.
+        while self.__over_limit() and len(self.__entries) > 1:
+            key = next(iter(self.__entries))
+            if key == keep:
+                break
+            self.__remove(key)
+            self.__stats[key].evictions += 1
@@ -9,11 +9,12 @@ import logging
 from pathlib import Path
 import sys
 from typing import List
-from beancounttant import Beancounttant
+from beancounttant import Beancounttant, metrics
 
 
 def main(config_file: Path,
-         document: Path) -> int:
+         document: Path,
+         metrics_file: Path = None) -> int:
     """
     Contains the main functionality of this script.
     """
@@ -22,18 +23,22 @@ def main(config_file: Path,
     if not document.exists():
         logger.error("Unable to find document at '%s'!", document)
 
-    beancounttant = Beancounttant.load_config(config_file)
-    doc_data = beancounttant.parse_document_filename(document.name)
+    try:
+        beancounttant = Beancounttant.load_config(config_file)
+        doc_data = beancounttant.parse_document_filename(document.name)
 
-    logger.info("Generating transaction for document '%s'...", document.name)
-    transaction = beancounttant.generate_transaction(doc_data)
-    print(transaction)
+        logger.info("Generating transaction for document '%s'...",
+                    document.name)
+        transaction = beancounttant.generate_transaction(doc_data)
+        transaction = beancounttant.fill_amounts(transaction, document)
+        print(transaction)
 
-    beancount_file = beancounttant.find_beancount_file(doc_data)
-    logger.info("Writing transaction to beancount file '%s'...",
-                beancount_file.name)
-    with beancount_file.open("a") as beancount_file_ptr:
-        beancount_file_ptr.write(str(transaction))
+        beancount_file = beancounttant.find_beancount_file(doc_data)
+        logger.info("Writing transaction to beancount file '%s'...",
+                    beancount_file.name)
+        beancounttant.write_transaction(transaction, beancount_file)
+    finally:
+        metrics.export_textfile(metrics_file)
 
 
 def parse_arguments(arguments: List[str]) -> argparse.Namespace:
@@ -55,6 +60,14 @@ def parse_arguments(arguments: List[str]) -> argparse.Namespace:
                         required=True,
                         type=Path,
                         help='Document for which to create a transaction.')
+    parser.add_argument('--metrics-file',
+                        '-m',
+                        dest='metrics_file',
+                        default=None,
+                        type=Path,
+                        help='Prometheus textfile collector file into which '
+                             'metrics are merged. Defaults to the file named '
+                             f'by {metrics.METRICS_FILE_VARIABLE}.')
 
     return parser.parse_args(arguments)
 
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+"""
+Replays a corpus of document filenames against the Beancounttant entry points
+to measure throughput and latency and to check the integrity of the ledger.
+"""
+
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
+import json
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+from beancounttant import Beancounttant
+import generate_transaction_from_document
+import manage_context_menus
+from synthetic_config import build_synthetic_config, synthetic_corpus
+
+MODES = ('menu', 'cli')
+PAUSES = []
+DEFAULT_SYNTHETIC_DIRECTIVES = 100
+
+
+def stub_input(*_) -> str:
+    """
+    Replaces input() so that pauses return immediately and are recorded.
+    Pauses only occur in the context menu when an error has occurred.
+    """
+    PAUSES.append(True)
+    return ''
+
+
+def stub_open_file(_: Path) -> None:
+    """
+    Replaces open_file_in_default_program() so that no programs are opened.
+    """
+
+
+def install_stubs() -> None:
+    """
+    Stubs out interactive behaviour of the entry points in this process.
+    """
+    manage_context_menus.input = stub_input
+    manage_context_menus.open_file_in_default_program = stub_open_file
+    logging.disable(logging.CRITICAL)
+
+
+def run_batch(mode: str,
+              config_file: Path,
+              filenames: List[str]) -> Tuple[float, int]:
+    """
+    Processes a batch of filenames as a single user action would.
+    Returns the elapsed seconds and the number of errors that occurred.
+    The context menu stops at its first error, so menu batches report at
+    most one error.
+    """
+    errors = 0
+    del PAUSES[:]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()):
+        if mode == 'menu':
+            manage_context_menus.generate_transaction(filenames,
+                                                      config_file.as_posix())
+            errors = len(PAUSES)
+        else:
+            for filename in filenames:
+                try:
+                    generate_transaction_from_document.main(config_file,
+                                                            Path(filename))
+                except Exception:  # pylint: disable=broad-except
+                    errors += 1
+    return time.perf_counter() - start, errors
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Returns the given percentile of a list of values.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] \
+        if ordered else 0.0
+
+
+def check_ledger(ledger_text: str, expected: List[str]) -> Tuple[int, int]:
+    """
+    Compares ledger contents against the transactions expected to be written.
+    Returns the number of missing transactions and of unexpected blocks,
+    which indicate corrupted or interleaved output.
+    """
+    blocks = Counter(block for block in ledger_text.split("\n\n") if block)
+    wanted = Counter(transaction.rstrip("\n") for transaction in expected)
+    return sum((wanted - blocks).values()), sum((blocks - wanted).values())
+
+
+def read_corpus(corpus_file: Path) -> List[str]:
+    """
+    Reads a recorded corpus containing one document filename per line.
+    """
+    with corpus_file.open("r") as file_obj:
+        return [line.strip() for line in file_obj if line.strip()]
+
+
+def expected_transactions(
+        beancounttant: Beancounttant,
+        mode: str,
+        batches: List[List[str]]) -> Tuple[List[str], int, int]:
+    """
+    Returns the transactions each batch should write, along with the number
+    of unparseable files and of files the context menu skips because an
+    earlier file in the same batch failed.
+    """
+    expected = []
+    unparseable = 0
+    skipped = 0
+    for batch in batches:
+        for index, filename in enumerate(batch):
+            try:
+                doc_data = beancounttant.parse_document_filename(
+                    Path(filename).name)
+            except ValueError:
+                unparseable += 1
+                if mode == 'menu':
+                    skipped += len(batch) - index - 1
+                    break
+                continue
+            transaction = beancounttant.generate_transaction(doc_data)
+            expected.append(str(beancounttant.fill_amounts(transaction,
+                                                           Path(filename))))
+    return expected, unparseable, skipped
+
+
+def positive_int(value: str) -> int:
+    """
+    Parses a command-line argument which must be a positive integer.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"'{value}' must be at least 1!")
+    return number
+
+
+def main(config_file: Path,
+         corpus_file: Path,
+         documents: int,
+         mode: str,
+         concurrency: int,
+         batch_size: int,
+         synthetic_directives: int = DEFAULT_SYNTHETIC_DIRECTIVES) -> int:
+    """
+    Contains the main functionality of this script.
+    """
+    logger = logging.getLogger()
+
+    if config_file:
+        with config_file.open("r") as file_obj:
+            config_data = json.load(file_obj)
+    else:
+        config_data = build_synthetic_config(synthetic_directives)
+
+    if corpus_file:
+        filenames = read_corpus(corpus_file)
+    elif config_file:
+        logger.error("A corpus file is required with a config file!")
+        return 1
+    else:
+        filenames = synthetic_corpus(documents, synthetic_directives)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ledger_file = Path(temp_dir) / "ledger.beancount"
+        ledger_file.touch()
+        config_data["default_beancount_file"] = ledger_file.as_posix()
+        config_data["settings"]["pause_when_successful"] = False
+        temp_config_file = Path(temp_dir) / "config.json"
+        with temp_config_file.open("w") as file_obj:
+            json.dump(config_data, file_obj)
+
+        batches = [filenames[index:index + batch_size]
+                   for index in range(0, len(filenames), batch_size)]
+        expected, unparseable, skipped = expected_transactions(
+            Beancounttant.load_config(temp_config_file), mode, batches)
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=concurrency,
+                                 initializer=install_stubs) as executor:
+            results = list(executor.map(run_batch,
+                                        [mode] * len(batches),
+                                        [temp_config_file] * len(batches),
+                                        batches))
+        elapsed = time.perf_counter() - start
+
+        missing, unexpected = check_ledger(ledger_file.read_text(), expected)
+
+    latencies = [latency for latency, _ in results]
+    errors = sum(error for _, error in results)
+    print(f"Mode: {mode}, concurrency: {concurrency}, "
+          f"batch size: {batch_size}")
+    print(f"Documents: {len(filenames)} in {len(batches)} batches "
+          f"({unparseable} unparseable, {skipped} skipped after an error)")
+    print(f"Elapsed: {elapsed:.3f} s, "
+          f"throughput: {len(filenames) / elapsed:.1f} documents/s")
+    print("Batch latency: p50 {:.4f} s, p95 {:.4f} s, p99 {:.4f} s, "
+          "max {:.4f} s".format(percentile(latencies, 0.5),
+                                percentile(latencies, 0.95),
+                                percentile(latencies, 0.99),
+                                max(latencies, default=0.0)))
+    print(f"Errors: {errors} " + ("failed batches" if mode == 'menu'
+                                    else "failed documents"))
+    print(f"Ledger: {missing} missing transactions, "
+          f"{unexpected} corrupted or interleaved blocks")
+    return 1 if missing or unexpected else 0
+
+
+def parse_arguments(arguments: List[str]) -> argparse.Namespace:
+    """
+    Parses command-line arguments into namespace data.
+    """
+    parser = argparse.ArgumentParser(
+        description="Load tests Beancounttant transaction generation."
+    )
+    parser.add_argument('--config-file',
+                        '-c',
+                        dest='config_file',
+                        default=None,
+                        type=Path,
+                        help='File containing Beancounttant configuration. '
+                             'A synthetic configuration is used if omitted.')
+    parser.add_argument('--corpus-file',
+                        '-f',
+                        dest='corpus_file',
+                        default=None,
+                        type=Path,
+                        help='File containing one document filename per line. '
+                             'A synthetic corpus is used if omitted.')
+    parser.add_argument('--documents',
+                        '-n',
+                        dest='documents',
+                        default=500,
+                        type=int,
+                        help='Number of documents in synthetic corpus.')
+    parser.add_argument('--synthetic-directives',
+                        '-s',
+                        dest='synthetic_directives',
+                        default=DEFAULT_SYNTHETIC_DIRECTIVES,
+                        type=positive_int,
+                        help='Number of directives in synthetic configuration.')
+    parser.add_argument('--mode',
+                        '-m',
+                        dest='mode',
+                        default='menu',
+                        choices=MODES,
+                        help='Entry point through which documents are fed.')
+    parser.add_argument('--concurrency',
+                        '-j',
+                        dest='concurrency',
+                        default=4,
+                        type=positive_int,
+                        help='Number of simultaneous user actions.')
+    parser.add_argument('--batch-size',
+                        '-b',
+                        dest='batch_size',
+                        default=1,
+                        type=positive_int,
+                        help='Number of documents selected per user action.')
+
+    return parser.parse_args(arguments)
+
+
+if __name__ == "__main__":
+    exit(main(**vars(parse_arguments(sys.argv[1:]))))
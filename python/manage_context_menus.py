@@ -10,7 +10,8 @@ import sys
 import traceback
 from typing import List
 from context_menu import menus
-from beancounttant import Beancounttant, open_file_in_default_program
+from beancounttant import Beancounttant, metrics, \
+                          open_file_in_default_program
 
 MENU_TITLE = 'Beancounttant'
 MENU_TYPE = 'FILES'
@@ -25,20 +26,21 @@ def generate_transaction(filenames: List[str], params: str) -> None:
         beancounttant = Beancounttant.load_config(Path(params))
         pause_if_successful = beancounttant.get_setting('pause_when_successful')
 
-        for filename in filenames:
+        for index, filename in enumerate(filenames):
+            metrics.QUEUE_DEPTH.set(len(filenames) - index - 1)
             document = Path(filename)
             doc_name = document.name
             doc_data = beancounttant.parse_document_filename(doc_name)
 
             print(f"Generating transaction for document '{doc_name}'...")
             transaction = beancounttant.generate_transaction(doc_data)
+            transaction = beancounttant.fill_amounts(transaction, document)
 
             beancount_file = beancounttant.find_beancount_file(doc_data)
             print("Writing transaction to beancount file '{}'...".format(
                 beancount_file.name
             ))
-            with beancount_file.open('a') as beancount_file_ptr:
-                beancount_file_ptr.write(str(transaction))
+            beancounttant.write_transaction(transaction, beancount_file)
 
             if beancounttant.get_setting('open_document'):
                 print('Opening document file...')
@@ -52,6 +54,8 @@ def generate_transaction(filenames: List[str], params: str) -> None:
         traceback.print_exc()
         error_occurred = True
     finally:
+        metrics.QUEUE_DEPTH.set(0)
+        metrics.export_textfile()
         if error_occurred or pause_if_successful:
             print("Press the Enter key to exit...")
             input()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""
+Reports the memory retained by the group directives of a Beancounttant
+configuration. Each configuration is measured twice: once with the original
+representation (mutable directives with lists and a fresh Amount per posting)
+as the "before" figure and once with the compact representation as the
+"after" figure. Both figures cover only the loaded directives.
+"""
+
+import argparse
+from dataclasses import dataclass
+import gc
+import json
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import tracemalloc
+from typing import Callable, List
+from beancount.core.amount import Amount
+from beancount.core.number import Decimal
+from beancount.core.position import CostSpec
+from beancounttant import load_group_directives
+from beancounttant.data import Posting, shared_amount
+from synthetic_config import build_synthetic_config
+
+
+@dataclass
+class BaselineDirective:
+    """
+    Mirrors the original, uncompacted PartialDirective representation.
+    """
+    flag: str = ""
+    payee: str = ""
+    narration: str = ""
+    tags: List[str] = None
+    metadata: dict = None
+    postings: List[Posting] = None
+    hide_payee: bool = False
+
+
+def baseline_posting(datum) -> Posting:
+    """
+    Builds a posting the way the original Posting.from_dict() and
+    Posting.from_name() did, with unshared Amounts and strings.
+    """
+    if not isinstance(datum, dict):
+        return Posting(datum,
+                       Amount(Decimal("0.00"), "USD"),
+                       cost=None,
+                       price=None,
+                       flag=None,
+                       meta=None)
+
+    costs = (datum.get("cost_per", None), datum.get("cost_total", None))
+    cost_data = None if all(cost is None for cost in costs) \
+        else CostSpec(
+            None if costs[0] is None else Decimal(costs[0]),
+            None if costs[1] is None else Decimal(costs[1]),
+            datum.get("cost_currency", "USD"),
+            date=None,
+            label=None,
+            merge=None)
+    post_meta = dict(hide_amt=True) if datum.get("hide_amt", None) else None
+    return Posting(datum["account"],
+                   Amount(Decimal(datum.get("amount", "0.00")),
+                          datum.get("currency", "USD")),
+                   cost=cost_data,
+                   price=None,
+                   flag=None,
+                   meta=post_meta)
+
+
+def load_baseline_directives(file: Path) -> dict:
+    """
+    Loads group directives from a file using the original representation.
+    """
+    with file.open("r") as file_obj:
+        config_data = json.load(file_obj)
+
+    directives = dict()
+    for group_name, group_data in config_data["groups"].items():
+        directives[group_name] = dict()
+        for name, values in group_data.items():
+            directive = BaselineDirective()
+            for attr, value in vars(directive).items():
+                setattr(directive, attr, values.get(attr, value))
+            if directive.postings:
+                directive.postings = [baseline_posting(datum)
+                                      for datum in directive.postings]
+            directives[group_name][name] = directive
+    return directives
+
+
+def load_directives(file: Path) -> dict:
+    """
+    Loads group directives from a file using the compact representation.
+    """
+    with file.open("r") as file_obj:
+        config_data = json.load(file_obj)
+    return load_group_directives(config_data["groups"])
+
+
+def count_directives(config_file: Path) -> int:
+    """
+    Returns the number of group directives defined in a configuration file.
+    """
+    with config_file.open("r") as file_obj:
+        config_data = json.load(file_obj)
+    return sum(len(group) for group in config_data["groups"].values())
+
+
+def measure_config(config_file: Path,
+                   loader: Callable[[Path], object]) -> int:
+    """
+    Returns the number of bytes retained by loading a configuration file.
+    """
+    # Amounts cached by earlier loads would otherwise go uncounted.
+    shared_amount.cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        loaded = loader(config_file)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del loaded
+    return after - before
+
+
+def main(config_file: Path, synthetic_directives: int) -> int:
+    """
+    Contains the main functionality of this script.
+    """
+    logger = logging.getLogger()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if config_file is None:
+            config_file = Path(temp_dir) / "config.json"
+            with config_file.open("w") as file_obj:
+                json.dump(build_synthetic_config(synthetic_directives),
+                          file_obj)
+        elif not config_file.exists():
+            logger.error("Unable to find config file at '%s'!", config_file)
+            return 1
+
+        directive_count = count_directives(config_file)
+        measurements = (
+            ("Before", measure_config(config_file, load_baseline_directives)),
+            ("After", measure_config(config_file, load_directives)))
+
+    print(f"Configured directives: {directive_count}")
+    for label, retained_bytes in measurements:
+        per_directive = retained_bytes / directive_count \
+            if directive_count else 0.0
+        print(f"{label}: {retained_bytes} bytes retained, "
+              f"{per_directive:.1f} bytes per directive")
+    return 0
+
+
+def parse_arguments(arguments: List[str]) -> argparse.Namespace:
+    """
+    Parses command-line arguments into namespace data.
+    """
+    parser = argparse.ArgumentParser(
+        description="Reports memory retained by a Beancounttant configuration."
+    )
+    parser.add_argument('--config-file',
+                        '-c',
+                        dest='config_file',
+                        default=None,
+                        type=Path,
+                        help='File containing Beancounttant configuration. '
+                             'A synthetic configuration is used if omitted.')
+    parser.add_argument('--synthetic-directives',
+                        '-n',
+                        dest='synthetic_directives',
+                        default=5000,
+                        type=int,
+                        help='Number of directives in synthetic configuration.')
+
+    return parser.parse_args(arguments)
+
+
+if __name__ == "__main__":
+    exit(main(**vars(parse_arguments(sys.argv[1:]))))
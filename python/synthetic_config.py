@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+"""
+Builds synthetic Beancounttant configurations and matching document corpora
+for the profiling and load-testing scripts.
+"""
+
+from typing import List
+
+
+def build_synthetic_config(directive_count: int) -> dict:
+    """
+    Builds configuration data containing the given number of group directives.
+    """
+    directives = dict()
+    for index in range(directive_count):
+        directives[f"Payee {index}"] = dict(
+            flag="!",
+            narration=f"Statement {index}",
+            tags=["statement", "bank"],
+            metadata=dict(source="synthetic"),
+            postings=["Assets:Bank:Checking",
+                      dict(account="Expenses:Fees", amount="0.00",
+                           currency="USD", hide_amt=True)])
+    return dict(default_beancount_file="ledger.beancount",
+                default_transaction_flag="*",
+                patterns=dict(date=r"\d{4}-\d{2}-\d{2}",
+                              identifier=r"(?<=\d{2} ).*(?= -)"),
+                settings=dict(open_document=False,
+                              open_beancount_file=False,
+                              pause_when_successful=False),
+                groups=dict(identifier=directives))
+
+
+def synthetic_corpus(document_count: int, directive_count: int) -> List[str]:
+    """
+    Returns document filenames that match the synthetic configuration.
+    """
+    return [f"2021-01-{1 + index % 28:02d} Payee {index % directive_count} "
+            "- Statement.pdf" for index in range(document_count)]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# pylint: disable=missing-function-docstring
+
+"""
+Contains unit tests for the module beancounttant.
+"""
+
+from datetime import date
+import json
+from pathlib import Path
+import tempfile
+import unittest
+from beancounttant import Beancounttant, PartialDirective
+from beancounttant.metrics import DOCUMENTS_PROCESSED, GENERATE_SECONDS, \
+                                  LEDGER_BYTES_WRITTEN, PARSE_FAILURES
+from beancounttant.data import Posting
+
+
+class TestPartialDirective(unittest.TestCase):
+    """
+    Unit tests the beancounttant.PartialDirective class.
+    """
+    part_dir: PartialDirective = PartialDirective.from_dict(dict(
+        flag='!',
+        narration='Test',
+        tags=['tag1', 'tag2'],
+        metadata=dict(invoice='0122'),
+        postings=['Assets:Bank', dict(account='Expenses:Fees',
+                                      amount='1.00')]))
+
+    def test_from_dict(self):
+        self.assertEqual(self.part_dir, PartialDirective(
+            flag='!',
+            narration='Test',
+            tags=('tag1', 'tag2'),
+            metadata=dict(invoice='0122'),
+            postings=(Posting.from_name('Assets:Bank'),
+                      Posting.from_dict(dict(account='Expenses:Fees',
+                                             amount='1.00')))))
+
+    def test_from_dict_defaults(self):
+        self.assertEqual(PartialDirective.from_dict(dict()), PartialDirective())
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(self.part_dir, '__dict__'))
+
+
+class TestBeancounttant(unittest.TestCase):
+    """
+    Unit tests the beancounttant.Beancounttant class.
+    """
+    config_data: dict = dict(
+        default_beancount_file='ledger.beancount',
+        default_transaction_flag='*',
+        patterns=dict(date=r'\d{4}-\d{2}-\d{2}',
+                      identifier=r'(?<=\d{2} ).*(?= -)',
+                      kind=r'(?<= - ).*(?=\.)'),
+        settings=dict(open_document=False),
+        groups=dict(
+            identifier=dict(Bank=dict(tags=['bank'],
+                                      postings=['Assets:Bank'])),
+            kind=dict(Statement=dict(flag='!',
+                                     tags=['statement', 'bank'],
+                                     postings=['Expenses:Fees']))))
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name) / 'config.json'
+        with self.config_file.open('w') as file_obj:
+            json.dump(self.config_data, file_obj)
+        self.beancounttant = Beancounttant.load_config(self.config_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_setting(self):
+        self.assertFalse(self.beancounttant.get_setting('open_document'))
+
+    def test_get_setting_missing(self):
+        with self.assertRaises(KeyError):
+            self.beancounttant.get_setting('missing')
+
+    def test_parse_document_filename(self):
+        doc_data = self.beancounttant.parse_document_filename(
+            '2021-01-01 Bank - Statement.pdf')
+        self.assertEqual(doc_data.date, date(2021, 1, 1))
+        self.assertEqual(doc_data.identifier, 'Bank')
+
+    def test_parse_document_filename_invalid(self):
+        failures = PARSE_FAILURES.value
+        with self.assertRaises(ValueError):
+            self.beancounttant.parse_document_filename('invalid.pdf')
+        self.assertEqual(PARSE_FAILURES.value, failures + 1)
+
+    def test_fill_amounts_not_configured(self):
+        doc_data = self.beancounttant.parse_document_filename(
+            '2021-01-01 Bank - Statement.pdf')
+        transaction = self.beancounttant.generate_transaction(doc_data)
+        self.assertIs(self.beancounttant.fill_amounts(
+            transaction, Path(self.temp_dir.name) / 'missing.pdf'), transaction)
+
+    def test_generate_transaction(self):
+        doc_data = self.beancounttant.parse_document_filename(
+            '2021-01-01 Bank - Statement.pdf')
+        self.assertEqual(
+            str(self.beancounttant.generate_transaction(doc_data)),
+            """2021-01-01 ! "Bank" #bank #statement
+  Assets:Bank    0.00 USD
+  Expenses:Fees    0.00 USD
+
+""")
+
+    def test_generate_transaction_timed(self):
+        doc_data = self.beancounttant.parse_document_filename(
+            '2021-01-01 Bank - Statement.pdf')
+        count = GENERATE_SECONDS.count
+        self.beancounttant.generate_transaction(doc_data)
+        self.assertEqual(GENERATE_SECONDS.count, count + 1)
+
+    def test_write_transaction(self):
+        doc_data = self.beancounttant.parse_document_filename(
+            '2021-01-01 Bank - Statement.pdf')
+        transaction = self.beancounttant.generate_transaction(doc_data)
+        beancount_file = Path(self.temp_dir.name) / 'ledger.beancount'
+        documents = DOCUMENTS_PROCESSED.value
+        written = LEDGER_BYTES_WRITTEN.value
+        self.beancounttant.write_transaction(transaction, beancount_file)
+        self.beancounttant.write_transaction(transaction, beancount_file)
+        self.assertEqual(beancount_file.read_text(), str(transaction) * 2)
+        self.assertEqual(DOCUMENTS_PROCESSED.value, documents + 2)
+        self.assertEqual(LEDGER_BYTES_WRITTEN.value,
+                         written + 2 * len(str(transaction).encode()))
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
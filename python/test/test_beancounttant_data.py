@@ -5,14 +5,17 @@
 Contains unit tests for the module beancounttant.data.
 """
 
+import copy
 from datetime import date
+import pickle
 from typing import List
 import unittest
 from beancount.core.amount import Amount
 from beancount.core.number import Decimal
 from beancount.core.position import CostSpec
 from beancounttant.data import str_or_empty, noneless_format, str_join, \
-                               cost_to_str, Posting, Transaction
+                               cost_to_str, intern_or_none, shared_amount, \
+                               Posting, Transaction
 
 class TestStrOrEmpty(unittest.TestCase):
     """
@@ -140,6 +143,30 @@ class TestCostToStr(unittest.TestCase):
         self.assertEqual(cost_to_str(self.cost_per_total), ' {2.00 # 3.14 PIE}')
 
 
+class TestInternOrNone(unittest.TestCase):
+    """
+    Unit tests the beancounttant module function intern_or_none().
+    """
+    def test_none(self):
+        self.assertIsNone(intern_or_none(None))
+
+    def test_string(self):
+        built = ''.join(['Assets:', 'Bank'])
+        self.assertIs(intern_or_none(built), intern_or_none('Assets:Bank'))
+
+
+class TestSharedAmount(unittest.TestCase):
+    """
+    Unit tests the beancounttant module function shared_amount().
+    """
+    def test_value(self):
+        self.assertEqual(shared_amount('3.14', 'PIE'),
+                         Amount(Decimal('3.14'), 'PIE'))
+
+    def test_shared(self):
+        self.assertIs(shared_amount('0.00', 'USD'), shared_amount('0.00', 'USD'))
+
+
 class TestPosting(unittest.TestCase):
     """
     Unit tests the beancounttant.Posting class.
@@ -191,6 +218,23 @@ class TestPosting(unittest.TestCase):
                                  flag=None,
                                  meta=None))
 
+    def test_from_dict_hide_amt(self):
+        post = Posting.from_dict(dict(account='hidden', hide_amt=True))
+        self.assertEqual(str(post), 'hidden')
+
+    def test_from_dict_hide_amt_copyable(self):
+        post = Posting.from_dict(dict(account='hidden', hide_amt=True))
+        self.assertEqual(copy.deepcopy(post), post)
+        self.assertEqual(pickle.loads(pickle.dumps(post)), post)
+
+    def test_from_dict_hide_amt_unshared(self):
+        first = Posting.from_dict(dict(account='a', hide_amt=True))
+        second = Posting.from_dict(dict(account='b', hide_amt=True))
+        self.assertIsNot(first.meta, second.meta)
+
+    def test_from_name_shares_amount(self):
+        self.assertIs(Posting.from_name('a').units, Posting.from_name('b').units)
+
     def test_from_name(self):
         self.assertEqual(self.post_name,
                          Posting('test',
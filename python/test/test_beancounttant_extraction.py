@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# pylint: disable=missing-function-docstring
+
+"""
+Contains unit tests for the module beancounttant.extraction.
+"""
+
+from datetime import date
+from pathlib import Path
+import tempfile
+import unittest
+from beancount.core.amount import Amount
+from beancount.core.number import Decimal
+from beancounttant.data import Posting, Transaction
+from beancounttant.extraction import parse_amount, iter_lines, AmountRule, \
+                                     AmountExtractor
+
+
+class TestParseAmount(unittest.TestCase):
+    """
+    Unit tests the beancounttant.extraction module function parse_amount().
+    """
+    def test_plain(self):
+        self.assertEqual(parse_amount('3.14'), Decimal('3.14'))
+
+    def test_symbols(self):
+        self.assertEqual(parse_amount(' $1,234.56 '), Decimal('1234.56'))
+
+    def test_negative(self):
+        self.assertEqual(parse_amount('-2.00'), Decimal('-2.00'))
+
+    def test_parentheses(self):
+        self.assertEqual(parse_amount('(2.00)'), Decimal('-2.00'))
+
+    def test_parentheses_signed(self):
+        for text in ('(-5.00)', '(+5.00)', '(5.00-)'):
+            with self.assertRaises(ValueError):
+                parse_amount(text)
+
+    def test_trailing_sign(self):
+        self.assertEqual(parse_amount('12.50-'), Decimal('-12.50'))
+
+    def test_currency_code(self):
+        self.assertEqual(parse_amount('-EUR 3.00'), Decimal('-3.00'))
+
+    def test_european(self):
+        self.assertEqual(parse_amount('1.234,56', ',', '.'), Decimal('1234.56'))
+
+    def test_no_thousands_separator(self):
+        self.assertEqual(parse_amount('1234,56', ',', ''), Decimal('1234.56'))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_amount('n/a')
+
+    def test_wrong_separators(self):
+        with self.assertRaises(ValueError):
+            parse_amount('1.234,56')
+
+    def test_misplaced_thousands(self):
+        with self.assertRaises(ValueError):
+            parse_amount('1,23')
+
+    def test_credit_marker(self):
+        with self.assertRaises(ValueError):
+            parse_amount('12.50 CR')
+
+    def test_multiple_signs(self):
+        with self.assertRaises(ValueError):
+            parse_amount('-12.50-')
+
+
+class TestIterLines(unittest.TestCase):
+    """
+    Unit tests the beancounttant.extraction module function iter_lines().
+    """
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file = Path(self.temp_dir.name) / 'lines.txt'
+        self.file.write_bytes('\ufeffone\ntwo\nthree'.encode('utf-8'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_buffered(self):
+        self.assertEqual(list(iter_lines(self.file)),
+                         ['one\n', 'two\n', 'three'])
+
+    def test_mmap(self):
+        self.assertEqual(list(iter_lines(self.file, mmap_threshold=1)),
+                         ['one\n', 'two\n', 'three'])
+
+    def test_empty(self):
+        self.file.write_bytes(b'')
+        self.assertEqual(list(iter_lines(self.file, mmap_threshold=1)), [])
+
+
+class TestAmountRule(unittest.TestCase):
+    """
+    Unit tests the beancounttant.extraction.AmountRule class.
+    """
+    def test_from_dict_requires_source(self):
+        with self.assertRaises(ValueError):
+            AmountRule.from_dict(dict(account='Assets:Bank'))
+
+    def test_from_dict_invalid_aggregate(self):
+        with self.assertRaises(ValueError):
+            AmountRule.from_dict(dict(account='Assets:Bank', column=0,
+                                      aggregate='mean'))
+
+    def test_search_named_group(self):
+        rule = AmountRule.from_dict(dict(
+            account='Assets:Bank',
+            regex=r'Balance (?P<amount>[\d.]+) as of (\d+)'))
+        self.assertEqual(rule.search('Balance 9.99 as of 2021'),
+                         Decimal('9.99'))
+
+    def test_search_no_match(self):
+        rule = AmountRule.from_dict(dict(account='Assets:Bank',
+                                         regex=r'Balance ([\d.]+)'))
+        self.assertIsNone(rule.search('Opening 1.00'))
+
+
+class TestAmountExtractor(unittest.TestCase):
+    """
+    Unit tests the beancounttant.extraction.AmountExtractor class.
+    """
+    extractor: AmountExtractor = AmountExtractor.from_dict(dict(rules=[
+        dict(account='Expenses:Fees', column='Amount', match_column='Memo',
+             match='FEE', negate=True),
+        dict(account='Assets:Bank', column=2, aggregate='last'),
+        dict(account='Income:Interest', regex=r'Interest: ([\d.]+)',
+             currency='CAD')]))
+    transaction: Transaction = Transaction(
+        date=date(2021, 1, 1),
+        flag='*',
+        payee='Bank',
+        narration=None,
+        tags=None,
+        links=None,
+        meta=None,
+        postings=[Posting.from_name('Assets:Bank'),
+                  Posting.from_dict(dict(account='Expenses:Fees',
+                                         hide_amt=True)),
+                  Posting.from_name('Expenses:Other')])
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.document = Path(self.temp_dir.name) / '2021-01-01 Bank.pdf'
+        self.document.touch()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_sidecar(self, suffix: str, text: str) -> Path:
+        sidecar = self.document.with_suffix(suffix)
+        sidecar.write_text(text)
+        return sidecar
+
+    def test_invalid_separators(self):
+        with self.assertRaises(ValueError):
+            AmountExtractor([], decimal_separator=',', thousands_separator=',')
+        with self.assertRaises(ValueError):
+            AmountExtractor([], decimal_separator='')
+
+    def test_extract_european_csv(self):
+        sidecar = self.write_sidecar('.csv', 'Memo;Amount\nFEE;"1.234,56"\n')
+        extractor = AmountExtractor.from_dict(dict(
+            decimal_separator=',',
+            thousands_separator='.',
+            delimiter=';',
+            rules=[dict(account='Expenses:Fees', column='Amount')]))
+        self.assertEqual(extractor.extract(sidecar), {
+            'Expenses:Fees': Amount(Decimal('1234.56'), None)})
+
+    def test_find_sidecar_none(self):
+        self.assertIsNone(self.extractor.find_sidecar(self.document))
+
+    def test_find_sidecar_order(self):
+        self.write_sidecar('.txt', '')
+        csv_file = self.write_sidecar('.csv', '')
+        self.assertEqual(self.extractor.find_sidecar(self.document), csv_file)
+
+    def test_extract_csv(self):
+        sidecar = self.write_sidecar('.csv', 'Memo,Other,Amount\n'
+                                             'FEE A,x,"1,000.50"\n'
+                                             'DEPOSIT,x,20.00\n'
+                                             'FEE B,x,(0.50)\n')
+        self.assertEqual(self.extractor.extract(sidecar), {
+            'Expenses:Fees': Amount(Decimal('-1000.00'), None),
+            'Assets:Bank': Amount(Decimal('-0.50'), None)})
+
+    def test_extract_csv_missing_column(self):
+        sidecar = self.write_sidecar('.csv', 'Memo,Value,Other\nFEE,1.00,2\n')
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(self.extractor.extract(sidecar), {
+                'Assets:Bank': Amount(Decimal('2'), None)})
+
+    def test_extract_csv_skips_unparseable(self):
+        sidecar = self.write_sidecar('.csv', 'Memo,Other,Amount\n'
+                                             'FEE A,x,1.00\n'
+                                             'FEE B,x,n/a\n'
+                                             'FEE TOTAL,x,Total: 1.00\n')
+        with self.assertLogs(level='WARNING'):
+            amounts = self.extractor.extract(sidecar)
+        self.assertEqual(amounts['Expenses:Fees'],
+                         Amount(Decimal('-1.00'), None))
+
+    def test_extract_csv_line_rules(self):
+        sidecar = self.write_sidecar('.csv', 'Memo,Other,Amount\n'
+                                             'Interest: 1.25,x,0\n')
+        self.assertEqual(self.extractor.extract(sidecar)['Income:Interest'],
+                         Amount(Decimal('1.25'), 'CAD'))
+
+    def test_column_rules_require_csv(self):
+        with self.assertRaises(ValueError):
+            AmountExtractor.from_dict(dict(
+                sidecar_suffixes=['.txt'],
+                rules=[dict(account='Expenses:Fees', column='Amount')]))
+
+    def test_extract_text(self):
+        sidecar = self.write_sidecar('.txt', 'Interest: 1.25\n'
+                                             'Fees: 3.00\n'
+                                             'Interest: 0.75\n')
+        self.assertEqual(self.extractor.extract(sidecar), {
+            'Income:Interest': Amount(Decimal('2.00'), 'CAD')})
+
+    def test_extract_large_csv(self):
+        rows = ''.join('FEE,x,0.01\n' for _ in range(200000))
+        sidecar = self.write_sidecar('.csv', 'Memo,Other,Amount\n' + rows)
+        extractor = AmountExtractor.from_dict(dict(
+            mmap_threshold=1024,
+            rules=[dict(account='Expenses:Fees', column='Amount')]))
+        self.assertEqual(extractor.extract(sidecar), {
+            'Expenses:Fees': Amount(Decimal('2000.00'), None)})
+
+    def test_fill_amounts(self):
+        self.write_sidecar('.csv', 'Memo,Other,Amount\nFEE,x,5.00\n')
+        self.assertEqual(
+            str(self.extractor.fill_amounts(self.transaction, self.document)),
+            """2021-01-01 * "Bank"
+  Assets:Bank    5.00 USD
+  Expenses:Fees    -5.00 USD
+  Expenses:Other    0.00 USD
+
+""")
+
+    def test_fill_amounts_unreadable_sidecar(self):
+        self.document.with_suffix('.csv').write_bytes(b'Amount\n\xff\xfe\n')
+        with self.assertLogs(level='WARNING'):
+            self.assertIs(self.extractor.fill_amounts(self.transaction,
+                                                      self.document),
+                          self.transaction)
+
+    def test_fill_amounts_no_sidecar(self):
+        self.assertIs(self.extractor.fill_amounts(self.transaction,
+                                                  self.document),
+                      self.transaction)
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# pylint: disable=missing-function-docstring
+
+"""
+Contains unit tests for the module beancounttant.metrics.
+"""
+
+import math
+import os
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+from urllib.request import urlopen
+from beancounttant.metrics import export_textfile, format_value, \
+                                  read_textfile, textfile_lock, Counter, \
+                                  Gauge, Metric, Summary, MetricsRegistry, \
+                                  DOCUMENTS_PROCESSED, METRICS_FILE_VARIABLE, \
+                                  REGISTRY
+
+
+class TestFormatValue(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics module function format_value().
+    """
+    def test_int(self):
+        self.assertEqual(format_value(3), '3')
+
+    def test_float(self):
+        self.assertEqual(format_value(0.25), '0.25')
+
+    def test_nan(self):
+        self.assertEqual(format_value(math.nan), 'NaN')
+
+    def test_inf(self):
+        self.assertEqual(format_value(math.inf), '+Inf')
+
+
+class TestReadTextfile(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics module function read_textfile().
+    """
+    def test_read_textfile(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_file = Path(temp_dir) / 'beancounttant.prom'
+            metrics_file.write_text('# HELP test Test.\n# TYPE test summary\n'
+                                    'test{quantile="0.5"} NaN\n'
+                                    'test_sum 0.5\ntest_count 2\n')
+            samples = read_textfile(metrics_file)
+        self.assertTrue(math.isnan(samples.pop('test{quantile="0.5"}')))
+        self.assertEqual(samples, {'test_sum': 0.5, 'test_count': 2})
+
+    def test_read_textfile_missing(self):
+        self.assertEqual(read_textfile(Path('missing.prom')), {})
+
+
+class TestTextfileLock(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics module function textfile_lock().
+    """
+    def test_lock(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_file = Path(temp_dir) / 'beancounttant.prom'
+            lock_file = Path(temp_dir) / 'beancounttant.prom.lock'
+            with textfile_lock(metrics_file):
+                self.assertTrue(lock_file.exists())
+            self.assertFalse(lock_file.exists())
+
+    def test_stale_lock(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_file = Path(temp_dir) / 'beancounttant.prom'
+            Path(temp_dir, 'beancounttant.prom.lock').touch()
+            with textfile_lock(metrics_file, timeout=0.05):
+                pass
+
+
+class TestMetric(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics.Metric class.
+    """
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            Metric('test', 'Test.')  # pylint: disable=abstract-class-instantiated
+
+
+class TestCounter(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics.Counter class.
+    """
+    def test_inc(self):
+        counter = Counter('test_total', 'Test counter.')
+        counter.inc()
+        counter.inc(2)
+        self.assertEqual(counter.value, 3)
+
+    def test_inc_negative(self):
+        with self.assertRaises(ValueError):
+            Counter('test_total', 'Test counter.').inc(-1)
+
+    def test_expose(self):
+        counter = Counter('test_total', 'Test counter.')
+        counter.inc()
+        self.assertEqual(counter.expose(), """# HELP test_total Test counter.
+# TYPE test_total counter
+test_total 1
+""")
+
+
+class TestGauge(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics.Gauge class.
+    """
+    def test_inc_dec(self):
+        gauge = Gauge('test', 'Test gauge.')
+        gauge.inc(5)
+        gauge.dec(2)
+        self.assertEqual(gauge.value, 3)
+
+    def test_set(self):
+        gauge = Gauge('test', 'Test gauge.')
+        gauge.set(7)
+        self.assertEqual(gauge.value, 7)
+
+
+class TestSummary(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics.Summary class.
+    """
+    def test_quantile_empty(self):
+        self.assertTrue(math.isnan(Summary('test', 'Test.').quantile(0.5)))
+
+    def test_quantile(self):
+        summary = Summary('test', 'Test.')
+        for value in range(1, 101):
+            summary.observe(value)
+        self.assertEqual(summary.quantile(0.5), 51)
+        self.assertEqual(summary.quantile(0.99), 100)
+
+    def test_window(self):
+        summary = Summary('test', 'Test.', window=2)
+        for value in (100, 1, 2):
+            summary.observe(value)
+        self.assertEqual(summary.quantile(0.99), 2)
+        self.assertEqual((summary.count, summary.total), (3, 103))
+
+    def test_time(self):
+        summary = Summary('test', 'Test.')
+        with summary.time():
+            pass
+        self.assertEqual(summary.count, 1)
+
+    def test_expose(self):
+        summary = Summary('test', 'Test.')
+        summary.observe(0.5)
+        self.assertEqual(summary.expose(), """# HELP test Test.
+# TYPE test summary
+test{quantile="0.5"} 0.5
+test{quantile="0.9"} 0.5
+test{quantile="0.99"} 0.5
+test_sum 0.5
+test_count 1
+""")
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics.MetricsRegistry class.
+    """
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.counter('test_total', 'Test counter.').inc()
+
+    def test_same_metric(self):
+        self.assertIs(self.registry.counter('test_total', 'Test counter.'),
+                      self.registry.counter('test_total', 'Test counter.'))
+
+    def test_conflicting_metric(self):
+        with self.assertRaises(ValueError):
+            self.registry.gauge('test_total', 'Test gauge.')
+
+    def test_write_textfile(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_file = Path(temp_dir) / 'beancounttant.prom'
+            self.registry.write_textfile(metrics_file)
+            self.assertEqual(metrics_file.read_text(), self.registry.expose())
+            self.assertEqual(list(Path(temp_dir).iterdir()), [metrics_file])
+
+    def test_write_textfile_merge(self):
+        other = MetricsRegistry()
+        other.counter('test_total', 'Test counter.').inc(2)
+        other.gauge('test_gauge', 'Test gauge.').set(5)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_file = Path(temp_dir) / 'beancounttant.prom'
+            other.write_textfile(metrics_file, merge=True)
+            self.registry.gauge('test_gauge', 'Test gauge.').set(1)
+            self.registry.write_textfile(metrics_file, merge=True)
+            samples = read_textfile(metrics_file)
+            self.assertEqual(samples, {'test_total': 3, 'test_gauge': 1})
+
+            # Only increases since the last write are added again.
+            self.registry.counter('test_total', 'Test counter.').inc()
+            self.registry.write_textfile(metrics_file, merge=True)
+            self.assertEqual(read_textfile(metrics_file)['test_total'], 4)
+            self.assertEqual(list(Path(temp_dir).iterdir()), [metrics_file])
+
+    def test_write_textfile_merge_summary(self):
+        summary = self.registry.summary('test', 'Test.')
+        summary.observe(0.5)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_file = Path(temp_dir) / 'beancounttant.prom'
+            metrics_file.write_text('test{quantile="0.5"} 9.0\n'
+                                    'test_sum 1.5\ntest_count 3\n')
+            self.registry.write_textfile(metrics_file, merge=True)
+            samples = read_textfile(metrics_file)
+        self.assertEqual(samples['test{quantile="0.5"}'], 0.5)
+        self.assertEqual((samples['test_sum'], samples['test_count']),
+                         (2.0, 4))
+
+    def test_serve(self):
+        server = self.registry.serve(0)
+        try:
+            port = server.server_address[1]
+            with urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+                self.assertEqual(response.read().decode(),
+                                 self.registry.expose())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestExportTextfile(unittest.TestCase):
+    """
+    Unit tests the beancounttant.metrics module function export_textfile().
+    """
+    def test_export_textfile_variable(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_file = Path(temp_dir) / 'beancounttant.prom'
+            with mock.patch.dict(os.environ,
+                                 {METRICS_FILE_VARIABLE: str(metrics_file)}):
+                export_textfile()
+            self.assertEqual(read_textfile(metrics_file)[
+                DOCUMENTS_PROCESSED.name], DOCUMENTS_PROCESSED.value)
+
+    def test_export_textfile_unset(self):
+        with mock.patch.dict(os.environ, clear=True), \
+                mock.patch.object(REGISTRY, 'write_textfile') as write:
+            export_textfile()
+        write.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# pylint: disable=missing-function-docstring
+
+"""
+Contains unit tests for the module beancounttant.registry.
+"""
+
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+import unittest
+from beancounttant import Beancounttant
+from beancounttant.registry import BeancounttantRegistry, ConfigStats
+
+
+class TestConfigStats(unittest.TestCase):
+    """
+    Unit tests the beancounttant.registry.ConfigStats class.
+    """
+    def test_hit_rate_empty(self):
+        self.assertEqual(ConfigStats().hit_rate, 0.0)
+
+    def test_hit_rate(self):
+        self.assertEqual(ConfigStats(hits=3, misses=1).hit_rate, 0.75)
+
+    def test_mean_load_seconds(self):
+        self.assertEqual(ConfigStats(load_count=2,
+                                     total_load_seconds=3.0).mean_load_seconds,
+                         1.5)
+
+
+class TestBeancounttantRegistry(unittest.TestCase):
+    """
+    Unit tests the beancounttant.registry.BeancounttantRegistry class.
+    """
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.configs = [self.write_config(f'config{index}.json', index)
+                        for index in range(3)]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config(self, name: str, flag: int) -> Path:
+        config_file = Path(self.temp_dir.name) / name
+        with config_file.open('w') as file_obj:
+            json.dump(dict(default_beancount_file='ledger.beancount',
+                           default_transaction_flag=str(flag),
+                           patterns=dict(),
+                           settings=dict(),
+                           groups=dict()),
+                      file_obj)
+        return config_file
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            BeancounttantRegistry(max_count=0)
+        with self.assertRaises(ValueError):
+            BeancounttantRegistry(max_size=0)
+
+    def test_get_cached(self):
+        registry = BeancounttantRegistry()
+        first = registry.get(self.configs[0])
+        self.assertIs(registry.get(self.configs[0]), first)
+        stats = registry.stats()[self.configs[0].resolve()]
+        self.assertEqual((stats.hits, stats.misses, stats.load_count),
+                         (1, 1, 1))
+
+    def test_reload_changed(self):
+        registry = BeancounttantRegistry()
+        first = registry.get(self.configs[0])
+        stat = self.configs[0].stat()
+        os.utime(self.configs[0], ns=(stat.st_atime_ns,
+                                      stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNot(registry.get(self.configs[0]), first)
+        self.assertEqual(registry.stats()[self.configs[0].resolve()].reloads, 1)
+
+    def test_load_outside_lock(self):
+        loading = threading.Event()
+        release = threading.Event()
+
+        def slow_loader(config_file: Path) -> Beancounttant:
+            if config_file.name == self.configs[0].name:
+                loading.set()
+                release.wait(5)
+            return Beancounttant.load_config(config_file)
+
+        registry = BeancounttantRegistry(loader=slow_loader)
+        registry.get(self.configs[1])
+        thread = threading.Thread(target=registry.get, args=(self.configs[0],))
+        thread.start()
+        try:
+            self.assertTrue(loading.wait(5))
+            registry.get(self.configs[1])
+            registry.get(self.configs[2])
+            self.assertNotIn(self.configs[0], registry)
+        finally:
+            release.set()
+            thread.join()
+        self.assertIn(self.configs[0], registry)
+
+    def test_concurrent_loads_once(self):
+        loads = []
+
+        def counting_loader(config_file: Path) -> Beancounttant:
+            loads.append(config_file)
+            return Beancounttant.load_config(config_file)
+
+        registry = BeancounttantRegistry(loader=counting_loader)
+        threads = [threading.Thread(target=registry.get,
+                                    args=(self.configs[0],))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(loads), 1)
+        stats = registry.stats()[self.configs[0].resolve()]
+        self.assertEqual((stats.hits, stats.misses), (7, 1))
+
+    def test_deleted_config(self):
+        registry = BeancounttantRegistry()
+        registry.get(self.configs[0])
+        self.configs[0].unlink()
+        with self.assertRaises(FileNotFoundError):
+            registry.get(self.configs[0])
+        self.assertEqual((len(registry), registry.size), (0, 0))
+
+    def test_loading_locks_dropped(self):
+        registry = BeancounttantRegistry(max_count=1)
+        for config in self.configs:
+            registry.get(config)
+        with self.assertRaises(FileNotFoundError):
+            registry.get(Path(self.temp_dir.name) / 'missing.json')
+        loading_locks = getattr(registry,
+                                '_BeancounttantRegistry__loading_locks')
+        self.assertEqual(list(loading_locks), [self.configs[2].resolve()])
+
+    def test_evict_count(self):
+        registry = BeancounttantRegistry(max_count=2)
+        for config in self.configs:
+            registry.get(config)
+        self.assertEqual(len(registry), 2)
+        self.assertNotIn(self.configs[0], registry)
+        self.assertEqual(registry.stats()[self.configs[0].resolve()].evictions,
+                         1)
+
+    def test_evict_least_recently_used(self):
+        registry = BeancounttantRegistry(max_count=2)
+        registry.get(self.configs[0])
+        registry.get(self.configs[1])
+        registry.get(self.configs[0])
+        registry.get(self.configs[2])
+        self.assertIn(self.configs[0], registry)
+        self.assertNotIn(self.configs[1], registry)
+
+    def test_evict_size(self):
+        config_size = self.configs[0].stat().st_size
+        registry = BeancounttantRegistry(max_size=config_size)
+        registry.get(self.configs[0])
+        registry.get(self.configs[1])
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.size, self.configs[1].stat().st_size)
+
+    def test_invalidate(self):
+        registry = BeancounttantRegistry()
+        registry.get(self.configs[0])
+        registry.invalidate(self.configs[0])
+        self.assertEqual((len(registry), registry.size), (0, 0))
+
+    def test_clear(self):
+        registry = BeancounttantRegistry()
+        for config in self.configs:
+            registry.get(config)
+        registry.clear()
+        self.assertEqual((len(registry), registry.size), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# pylint: disable=missing-function-docstring
+
+"""
+Contains unit tests for the script load_test_ingestion.
+"""
+
+import json
+from pathlib import Path
+import tempfile
+import unittest
+from beancounttant import Beancounttant
+from load_test_ingestion import check_ledger, expected_transactions, \
+                                percentile
+from synthetic_config import build_synthetic_config, synthetic_corpus
+
+
+class TestLoadTestIngestion(unittest.TestCase):
+    """
+    Unit tests the functions of the script load_test_ingestion.
+    """
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        config_file = Path(self.temp_dir.name) / 'config.json'
+        with config_file.open('w') as file_obj:
+            json.dump(build_synthetic_config(2), file_obj)
+        self.beancounttant = Beancounttant.load_config(config_file)
+        self.filenames = synthetic_corpus(2, 2)
+        self.transactions = [str(self.beancounttant.generate_transaction(
+            self.beancounttant.parse_document_filename(filename)))
+                             for filename in self.filenames]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_check_ledger(self):
+        self.assertEqual(check_ledger(''.join(reversed(self.transactions)),
+                                      self.transactions), (0, 0))
+
+    def test_check_ledger_interleaved(self):
+        first, second = self.transactions
+        ledger = first[:20] + second + first[20:]
+        self.assertEqual(check_ledger(ledger, self.transactions), (2, 2))
+
+    def test_check_ledger_truncated(self):
+        first, second = self.transactions
+        ledger = first + second[:-10]
+        self.assertEqual(check_ledger(ledger, self.transactions), (1, 1))
+
+    def test_expected_transactions_menu(self):
+        batch = [self.filenames[0], 'invalid.pdf', self.filenames[1]]
+        self.assertEqual(
+            expected_transactions(self.beancounttant, 'menu', [batch]),
+            (self.transactions[:1], 1, 1))
+
+    def test_expected_transactions_cli(self):
+        batch = [self.filenames[0], 'invalid.pdf', self.filenames[1]]
+        self.assertEqual(
+            expected_transactions(self.beancounttant, 'cli', [batch]),
+            (self.transactions, 1, 0))
+
+    def test_percentile(self):
+        values = [float(value) for value in range(100, 0, -1)]
+        self.assertEqual(percentile(values, 0.5), 51.0)
+        self.assertEqual(percentile(values, 0.99), 100.0)
+        self.assertEqual(percentile(values, 1.0), 100.0)
+
+    def test_percentile_empty(self):
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# pylint: disable=missing-function-docstring
+
+"""
+Contains unit tests for the script report_config_memory.
+"""
+
+import json
+from pathlib import Path
+import tempfile
+import unittest
+from beancounttant import PartialDirective
+from report_config_memory import baseline_posting, count_directives, \
+                                 load_baseline_directives, load_directives, \
+                                 measure_config, BaselineDirective
+
+
+class TestReportConfigMemory(unittest.TestCase):
+    """
+    Unit tests the functions of the script report_config_memory.
+    """
+    postings: list = ['Assets:Bank',
+                      dict(account='Expenses:Fees', amount='1.00',
+                           currency='CAD', cost_per='2.00', hide_amt=True)]
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name) / 'config.json'
+        with self.config_file.open('w') as file_obj:
+            json.dump(dict(groups=dict(
+                identifier=dict(Bank=dict(flag='!', tags=['bank'],
+                                          postings=self.postings)),
+                kind=dict(Statement=dict(narration='Statement'),
+                          Invoice=dict()))), file_obj)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_count_directives(self):
+        self.assertEqual(count_directives(self.config_file), 3)
+
+    def test_baseline_posting_matches_compact(self):
+        compact = PartialDirective.from_dict(dict(postings=self.postings))
+        self.assertEqual(tuple(baseline_posting(datum)
+                               for datum in self.postings),
+                         compact.postings)
+
+    def test_load_baseline_directives(self):
+        directives = load_baseline_directives(self.config_file)
+        self.assertEqual(directives['identifier']['Bank'], BaselineDirective(
+            flag='!',
+            tags=['bank'],
+            postings=[baseline_posting(datum) for datum in self.postings]))
+        self.assertEqual(directives['kind']['Invoice'], BaselineDirective())
+
+    def test_load_directives(self):
+        directives = load_directives(self.config_file)
+        self.assertEqual(directives['kind']['Statement'],
+                         PartialDirective(narration='Statement'))
+
+    def test_loaders_build_same_directives(self):
+        baseline = load_baseline_directives(self.config_file)
+        compact = load_directives(self.config_file)
+        self.assertEqual(
+            {group: {name: tuple(directive.postings or ())
+                     for name, directive in directives.items()}
+             for group, directives in baseline.items()},
+            {group: {name: tuple(directive.postings or ())
+                     for name, directive in directives.items()}
+             for group, directives in compact.items()})
+
+    def test_measure_config(self):
+        self.assertGreater(measure_config(self.config_file, load_directives),
+                           0)
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover